@@ -1,32 +1,58 @@
+import os
 import re
+import sys
+from array import array
+from functools import lru_cache
+from importlib.util import find_spec
+from itertools import chain, islice
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
 import requests
-from typing import List, Tuple, Optional
 
 try:
     from bs4 import BeautifulSoup
 except ImportError:
     BeautifulSoup = None
 
+# Let BeautifulSoup use lxml's C parser when it is installed, without importing it here
+_BS_PARSER = None
+if BeautifulSoup:
+    _BS_PARSER = 'lxml' if find_spec('lxml') is not None else 'html.parser'
+
+_PUB_ID_RE = re.compile(r"/d/e/([-\w]+)/")
+_DOC_ID_RE = re.compile(r"/d/([-\w]+)/")
+
+# Shared session so repeated fetches reuse the keep-alive connection to
+# docs.google.com instead of paying a new TCP/TLS handshake each time
+_SESSION = requests.Session()
+# (connect, read) timeouts in seconds
+_TIMEOUT = (5, 30)
+
+# Set GRID_PARSER_DEBUG=1 to dump the first parsed tokens in print_grid_from_doc
+_DEBUG = bool(os.environ.get("GRID_PARSER_DEBUG"))
 
+
+@lru_cache(maxsize=1024)
 def _convert_to_export_url(doc_url: str) -> str:
     """
     Convert Google Doc URLs into a plain-text export URL.
     Supports both regular edit links (/d/<ID>/) and published links (/d/e/<ID>/pub).
     """
     # 1) Published form: /d/e/<PUB_ID>/pub
-    m = re.search(r"/d/e/([-\w]+)/", doc_url)
+    m = _PUB_ID_RE.search(doc_url)
     if m:
         pub_id = m.group(1)
         return f"https://docs.google.com/document/d/e/{pub_id}/pub?output=txt"
 
     # 2) Edit form: /d/<DOC_ID>/
-    m = re.search(r"/d/([-\w]+)/", doc_url)
+    m = _DOC_ID_RE.search(doc_url)
     if not m:
         raise ValueError(f"Couldn’t find a document ID in {doc_url!r}")
     doc_id = m.group(1)
     return f"https://docs.google.com/document/d/{doc_id}/export?format=txt"
 
-def extract_entries(tokens: List[str]) -> List[Tuple[int, int, str]]:
+def extract_entries(tokens: List[str], start_index: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Scan through whitespace-delimited tokens and extract valid (x, y, char) triples.
 
@@ -35,134 +61,224 @@ def extract_entries(tokens: List[str]) -> List[Tuple[int, int, str]]:
       - tokens[i+1]  is exactly one character (char)
       - tokens[i+2]  is an integer string (y)
 
+    Every token is classified at once with NumPy string ops; the sliding
+    window only has to be walked in Python where candidate triples overlap.
+
     Args:
-        tokens: List of text tokens after dropping header cells.
+        tokens: List of text tokens.
+        start_index: Number of leading tokens (e.g. header cells) to skip.
 
     Returns:
-        A list of tuples (x, y, char).
+        Parallel arrays (xs, ys, chars) with dtypes int32, int32 and U1.
     """
-    entries: List[Tuple[int, int, str]] = []
-    i = 0
-    n = len(tokens)
-    while i < n - 2:
-        xs, ch, ys = tokens[i], tokens[i+1], tokens[i+2]
+    # Build the array straight from the tokens after start_index: no list copy,
+    # and the skipped header cells don't widen the fixed U dtype
+    n = max(len(tokens) - start_index, 0)
+    width = max(map(len, islice(tokens, start_index, None)), default=1)
+    arr = np.fromiter(islice(tokens, start_index, None), dtype=f'U{width}', count=n)
+    if n < 3:
+        return (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32),
+                np.empty(0, dtype='U1'))
+
+    is_int = np.char.isdigit(np.char.lstrip(arr, '-'))
+    is_char = np.char.str_len(arr) == 1
+    starts = np.flatnonzero(is_int[:-2] & is_char[1:-1] & is_int[2:])
+
+    # A triple consumes its three tokens, so a candidate starting inside the
+    # previous accepted triple is skipped. Well-formed tables have no overlaps.
+    if len(starts) > 1 and np.diff(starts).min() < 3:
+        keep: List[int] = []
+        next_free = 0
+        for i in starts.tolist():
+            if i >= next_free:
+                keep.append(i)
+                next_free = i + 3
+        starts = np.asarray(keep, dtype=np.intp)
+
+    xs = arr[starts].astype(np.int32)
+    chars = arr[starts + 1].astype('U1')
+    ys = arr[starts + 2].astype(np.int32)
+    return xs, ys, chars
+
+def iter_entries(tokens: Iterable[str]) -> Iterator[Tuple[int, int, str]]:
+    """
+    Streaming counterpart of extract_entries().
+
+    Consumes tokens one at a time and yields each (x, y, char) triple as soon
+    as it is complete, using the same sliding-window rules. Only the current
+    three-token window is held in memory.
+    """
+    window: List[str] = []
+    for tok in tokens:
+        window.append(tok)
+        if len(window) < 3:
+            continue
+        xs, ch, ys = window
         if xs.lstrip('-').isdigit() and ys.lstrip('-').isdigit() and len(ch) == 1:
-            entries.append((int(xs), int(ys), ch))
-            i += 3
+            yield (int(xs), int(ys), ch)
+            window.clear()
         else:
-            i += 1
-    return entries
-    
+            del window[0]
+
+def _keep_until_entry(lines: Iterable[str], kept: List[str], entries: array) -> Iterator[str]:
+    """
+    Yield lines unchanged, appending each one to kept while entries is empty.
+
+    Once the caller has parsed its first entry into entries, kept stops
+    growing, so it only ever holds the lines read before that point.
+    """
+    for line in lines:
+        if not entries:
+            kept.append(line)
+        yield line
+
 def print_grid_from_doc(doc_url: str) -> None:
     """
     Fetch a Google Doc table of <x> <char> <y> entries and render a 2D grid.
 
     Steps:
       1) Export the Doc to plain text via _convert_to_export_url.
-      2) Tokenize on whitespace and drop the first three header tokens.
-      3) Extract (x, y, char) tuples using extract_entries().
+      2) Stream the body line by line, tokenize on whitespace and drop the
+         first three header tokens.
+      3) Extract (x, y, char) tuples using iter_entries() as tokens arrive.
       4) If no entries found and BeautifulSoup is available, parse the HTML table as fallback.
-      5) Compute grid dimensions and allocate a 2D list of spaces.
-      6) Place each character at grid[y][x].
-      7) Print rows from top down to form the secret message.
+      5) Compute grid dimensions and allocate a (height, width) U1 array of spaces.
+      6) Place every character at grid[y, x] with one fancy-indexed store.
+      7) Write all rows, top down, to stdout in a single call.
 
     Time Complexity: O(T + W·H)
     Space Complexity: O(W·H)
     """
-    # Build export URL and fetch content
+    # Build export URL and stream the content line by line
     export_url = _convert_to_export_url(doc_url)
-    response = requests.get(export_url)
-    response.raise_for_status()
-    text = response.text
-
-    # 1) Turn the entire document into a flat list of tokens
-    tokens = re.split(r"\s+", response.text.strip())
-    # tokens[0:3] == ["x-coordinate","Character","y-coordinate"]
-    data = tokens[3:]  # everything after the header
-
-    #DEBUG # immediately after data = tokens[3:]
-    print(f"Total data tokens = {len(data)}")
-    print("First 50 tokens:", data[:50])
-    
-    # show exactly what your parser is seeing, and why it’s rejecting every triple
-    for idx in range(min(20, len(data) - 2)):
-        xs, ch, ys = data[idx], data[idx+1], data[idx+2]
-        is_x_int = xs.lstrip('-').isdigit()
-        is_y_int = ys.lstrip('-').isdigit()
-        is_char_single = len(ch) == 1
-        print(f"{idx:2d} → xs={xs!r} int?{is_x_int} | ch={ch!r} len?{len(ch)} | ys={ys!r} int?{is_y_int}")
+    with _SESSION.get(export_url, stream=True, timeout=_TIMEOUT) as response:
+        response.raise_for_status()
+        # Without a charset requests would yield bytes from iter_lines()
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        lines = response.iter_lines(chunk_size=8192, decode_unicode=True)
 
+        # Keep the raw lines for the HTML fallback, but only until the first
+        # entry parses: a doc with entries holds just its header lines, while a
+        # doc with none keeps its whole body, which the fallback needs anyway
+        x_buf, y_buf, char_buf = array('i'), array('i'), array('I')
+        kept: List[str] = []
 
-    # 2) Sliding-window parse: int, single-char, int
-    entries = extract_entries(data)
+        # 1) Tokenize each line as it arrives
+        tokens = (tok for line in _keep_until_entry(lines, kept, x_buf)
+                  for tok in line.split())
+        # tokens[0:3] == ["x-coordinate","Character","y-coordinate"]
+        data = islice(tokens, 3, None)  # everything after the header
 
-    # Fallback: HTML table parsing
-    if (not entries or len(data) % 3 != 0) and BeautifulSoup:
-        soup = BeautifulSoup(text, 'html.parser')
+        if _DEBUG:
+            # peek at the head of the stream; it is replayed into the parser below
+            head = list(islice(data, 50))
+            print("First 50 tokens:", head)
+
+            # show exactly what your parser is seeing, and why it’s rejecting every triple
+            for idx in range(min(20, len(head) - 2)):
+                xs, ch, ys = head[idx], head[idx+1], head[idx+2]
+                is_x_int = xs.lstrip('-').isdigit()
+                is_y_int = ys.lstrip('-').isdigit()
+                print(f"{idx:2d} → xs={xs!r} int?{is_x_int} | ch={ch!r} len?{len(ch)} | ys={ys!r} int?{is_y_int}")
+            data = chain(head, data)
+
+        # 2) Sliding-window parse: int, single-char, int, stored column-wise.
+        #    Track the grid extent while parsing so no second pass is needed.
+        #    Chars are kept as UCS-4 code points, the same layout as a U1 array.
+        max_x = max_y = -1
+        for x, y, ch in iter_entries(data):
+            x_buf.append(x)
+            y_buf.append(y)
+            char_buf.append(ord(ch))
+            if x > max_x:
+                max_x = x
+            if y > max_y:
+                max_y = y
+        xs = np.asarray(x_buf, dtype=np.int32)
+        ys = np.asarray(y_buf, dtype=np.int32)
+        chars = np.asarray(char_buf, dtype=np.uint32).view('U1')
+
+    # Fallback: HTML table parsing of the kept lines
+    if not xs.size and BeautifulSoup:
+        soup = BeautifulSoup("\n".join(kept), _BS_PARSER)
         table = soup.find('table')
         if table:
             cells = table.find_all(['th', 'td'])
             tokens = [cell.get_text(strip=True) for cell in cells]
-            data = tokens[3:]
-            entries = extract_entries(data)
+            xs, ys, chars = extract_entries(tokens, start_index=3)
+            if xs.size:
+                max_x, max_y = int(xs.max()), int(ys.max())
 
 
     # 3) Now you have entries!  Proceed as before:
-    if not entries:
+    if not xs.size:
         print("❌ No entries found!")
         return
 
-    max_x = max(e[0] for e in entries)
-    max_y = max(e[1] for e in entries)
     width, height = max_x + 1, max_y + 1
 
-    # 4) Build and print the grid
-    grid = [[" "] * width for _ in range(height)]
-    for x, y, ch in entries:
-        grid[y][x] = ch
+    # 4) Build the grid as one contiguous U1 block and scatter every char at once
+    grid = np.full((height, width), " ", dtype="U1")
+    grid[ys, xs] = chars
+
+    # Print from top row down to bottom in one write; the U<width> view reads
+    # each row as one str
+    rows = grid.view(f"U{width}").ravel()[::-1].tolist()
+    sys.stdout.write("\n".join(rows) + "\n")
 
-    # Print from top row down to bottom
-    for row in range(height - 1, -1, -1):
-        print("".join(grid[row]))
+def _is_signed_decimal(s: str) -> bool:
+    """
+    True if s is an optional '+' or '-' followed by decimal digits.
+
+    This is narrower than int(), which also accepts '_' digit separators
+    (e.g. '1_0'); such coordinates are skipped.
+    """
+    return (s[1:] if s.startswith(('+', '-')) else s).isdecimal()
 
 def debug_print_grid(doc_url: str):
     export_url = _convert_to_export_url(doc_url)
     print(f"→ Export URL: {export_url}")
     
-    resp = requests.get(export_url)
+    resp = _SESSION.get(export_url, timeout=_TIMEOUT)
     print(f"→ HTTP status: {resp.status_code}\n")
     
     lines = resp.text.splitlines()
     print(f"→ Raw lines ({len(lines)}): {lines[:10]!r}\n")
     
-    entries = []
+    x_buf, y_buf, char_buf = array('i'), array('i'), []
+    max_x = max_y = -1
     for line in lines:
         parts = line.strip().split()
         if len(parts) != 3:
             continue
         c, xs, ys = parts
-        try:
-            x, y = int(xs), int(ys)
-            entries.append((x, y, c))
-        except ValueError:
+        # Pre-check instead of catching int()'s ValueError: well-formed lines
+        # never raise, so skipping the handler keeps the common path cheap
+        if not (_is_signed_decimal(xs) and _is_signed_decimal(ys)):
             continue
+        x, y = int(xs), int(ys)
+        x_buf.append(x)
+        y_buf.append(y)
+        char_buf.append(c)
+        if x > max_x:
+            max_x = x
+        if y > max_y:
+            max_y = y
     
-    print(f"→ Parsed entries: {len(entries)} (showing up to 10):")
-    print(entries[:10], "\n")
+    print(f"→ Parsed entries: {len(x_buf)} (showing up to 10):")
+    print(list(zip(x_buf[:10], y_buf[:10], char_buf[:10])), "\n")
     
-    if not entries:
+    if not x_buf:
         print("❌ No valid char-coordinate entries found.")
         return
     
-    max_x = max(x for x,_,_ in entries)
-    max_y = max(y for _,y,_ in entries)
     print(f"→ Grid size: {max_y+1} rows × {max_x+1} cols\n")
     
     grid = [[" "] * (max_x+1) for _ in range(max_y+1)]
-    for x, y, c in entries:
+    for x, y, c in zip(x_buf, y_buf, char_buf):
         grid[y][x] = c
     
     print("→ Final grid:")
-    for row in grid:
-        print("".join(row))
+    sys.stdout.write("\n".join("".join(row) for row in grid) + "\n")
 
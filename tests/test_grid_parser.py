@@ -1,6 +1,119 @@
+import io
+import re
+
 import pytest
-from src.grid_parser import _convert_to_export_url
+import requests
+from src import grid_parser
+from src.grid_parser import _convert_to_export_url, debug_print_grid, extract_entries, iter_entries, print_grid_from_doc
+
+DOC_URL = "https://docs.google.com/document/d/ABC123/edit"
+DOC_TEXT = "x-coordinate Character y-coordinate\n0 █ 0\n0 █ 1\n0 █ 2\n1 ▀ 1\n1 ▀ 2\n2 ▀ 1\n2 ▀ 2\n3 ▀ 2\n"
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.status_code = 200
+        self.encoding = "utf-8"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, chunk_size=512, decode_unicode=False):
+        return iter(self.text.splitlines())
+
+
+class StubSoup:
+    """Stands in for BeautifulSoup: finds <td> cells with a regex."""
+
+    def __init__(self, markup, parser):
+        self.cells = re.findall(r"<td>(.*?)</td>", markup)
+
+    def find(self, name):
+        return self if self.cells else None
+
+    def find_all(self, names):
+        return [StubCell(text) for text in self.cells]
+
+
+class StubCell:
+    def __init__(self, text):
+        self.text = text
+
+    def get_text(self, strip=False):
+        return self.text.strip() if strip else self.text
+
 
 def test_convert_url():
     url = "https://docs.google.com/document/d/ABC123/edit"
     assert _convert_to_export_url(url) == "https://docs.google.com/document/d/ABC123/export?format=txt"
+
+def test_convert_pub_url():
+    url = "https://docs.google.com/document/d/e/2PACX-1vXYZ/pub"
+    assert _convert_to_export_url(url) == "https://docs.google.com/document/d/e/2PACX-1vXYZ/pub?output=txt"
+
+def test_convert_url_without_id():
+    with pytest.raises(ValueError):
+        _convert_to_export_url("https://example.com/not-a-doc")
+
+def test_iter_entries_matches_extract_entries():
+    tokens = "junk 0 █ 0 1 x 2 2 -1 ab 3 ▀ 1 7".split()
+    expected = [(0, 0, "█"), (1, 2, "x"), (3, 1, "▀")]
+    xs, ys, chars = extract_entries(tokens)
+    assert list(zip(xs.tolist(), ys.tolist(), chars.tolist())) == expected
+    assert list(iter_entries(iter(tokens))) == expected
+
+def test_extract_entries_skips_overlapping_triples():
+    # "5" is both a valid coordinate and a valid char, so windows overlap
+    xs, ys, chars = extract_entries("1 5 2 7 3 4 9".split())
+    assert xs.tolist() == [1, 7] and chars.tolist() == ["5", "3"] and ys.tolist() == [2, 4]
+
+def test_extract_entries_non_ascii_digits():
+    tokens = "junk 0 █ 0 1 x 2 -3 5 ٣ 2 -1 ab 3 ▀ 1 7".split()
+    assert [a.tolist() for a in extract_entries(tokens)] == [[0, 1, -3, 3], [0, 2, 3, 1], ["█", "x", "5", "▀"]]
+
+def test_extract_entries_start_index():
+    tokens = "x-coordinate Character y-coordinate 4 q 5".split()
+    xs, ys, chars = extract_entries(tokens, start_index=3)
+    assert (xs.tolist(), ys.tolist(), chars.tolist()) == ([4], [5], ["q"])
+
+def test_extract_entries_short_input():
+    xs, ys, chars = extract_entries(["1", "a"])
+    assert len(xs) == len(ys) == len(chars) == 0
+
+def test_print_grid_from_doc(monkeypatch, capsys):
+    monkeypatch.setattr(grid_parser._SESSION, "get", lambda url, **kw: FakeResponse(DOC_TEXT))
+    print_grid_from_doc(DOC_URL)
+    out = capsys.readouterr().out.splitlines()
+    assert out[-3:] == ["█▀▀▀", "█▀▀ ", "█   "]
+
+def test_debug_print_grid_skips_malformed_lines(monkeypatch, capsys):
+    text = "Character x y\n█ 0 0\n█ --1 0\n▀ 1 ²\n▀ +1 0\n▀ 2 1_0\nnot a line at all\n"
+    monkeypatch.setattr(grid_parser._SESSION, "get", lambda url, **kw: FakeResponse(text))
+    debug_print_grid(DOC_URL)
+    out = capsys.readouterr().out.splitlines()
+    assert "→ Parsed entries: 2 (showing up to 10):" in out
+    assert out[-1] == "█▀"
+
+def test_print_grid_from_doc_without_charset(monkeypatch, capsys):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(DOC_TEXT.encode("utf-8"))
+    assert response.encoding is None
+    monkeypatch.setattr(grid_parser._SESSION, "get", lambda url, **kw: response)
+    print_grid_from_doc(DOC_URL)
+    assert capsys.readouterr().out.splitlines()[-3:] == ["█▀▀▀", "█▀▀ ", "█   "]
+
+def test_print_grid_from_doc_html_fallback(monkeypatch, capsys):
+    cells = ["x", "c", "y", "0", "#", "0", "1", "@", "0", "1", "#", "1"]
+    html = "<table>\n" + "\n".join(f"<td>{c}</td>" for c in cells) + "\n</table>\n"
+    monkeypatch.setattr(grid_parser._SESSION, "get", lambda url, **kw: FakeResponse(html))
+    monkeypatch.setattr(grid_parser, "BeautifulSoup", StubSoup)
+    print_grid_from_doc(DOC_URL)
+    assert capsys.readouterr().out.splitlines()[-2:] == [" #", "#@"]